@@ -1,19 +1,139 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+import pydeck as pdk
+from plotly_resampler import FigureResampler
+from collections import deque
 from datetime import datetime
 
+st.set_page_config(page_title="🌊 FloatChat (Enhanced Frontend)", layout="wide")
+
 # -------------------------
 # Fake Data (placeholder only)
 # -------------------------
-sample_data = pd.DataFrame({
-    "float_id": ["ARGO001", "ARGO002", "ARGO003", "ARGO004", "ARGO005"],
-    "lat": [1.2, -2.1, 0.5, 15.0, -4.5],
-    "lon": [33.5, 35.0, 72.8, 60.1, 50.0],
-    "date": pd.to_datetime(["2023-03-05", "2023-03-12", "2023-03-20", "2023-04-02", "2023-03-25"]),
-    "salinity": [35.1, 34.9, 35.3, 36.1, 34.8],
-    "temperature": [28.3, 27.8, 28.5, 26.4, 28.0]
-})
+@st.cache_data(max_entries=1)
+def load_sample_data():
+    return pd.DataFrame({
+        "float_id": np.array(["ARGO001", "ARGO002", "ARGO003", "ARGO004", "ARGO005"]),
+        "lat": np.array([1.2, -2.1, 0.5, 15.0, -4.5], dtype=np.float64),
+        "lon": np.array([33.5, 35.0, 72.8, 60.1, 50.0], dtype=np.float64),
+        "date": np.array(["2023-03-05", "2023-03-12", "2023-03-20", "2023-04-02", "2023-03-25"], dtype="datetime64[D]"),
+        "salinity": np.array([35.1, 34.9, 35.3, 36.1, 34.8], dtype=np.float64),
+        "temperature": np.array([28.3, 27.8, 28.5, 26.4, 28.0], dtype=np.float64)
+    })
+
+
+sample_data = load_sample_data()
+
+
+# Precomputed views over the static demo data
+@st.cache_data
+def march_2023_df():
+    return sample_data[sample_data["date"].dt.month == 3]
+
+
+@st.cache_data
+def salinity_series():
+    return sample_data.set_index("date")["salinity"]
+
+
+@st.cache_data
+def temperature_series():
+    return sample_data.set_index("date")["temperature"]
+
+
+# Date-sorted copy so range filters can bisect instead of masking
+@st.cache_data(max_entries=1)
+def sorted_sample_data():
+    return load_sample_data().sort_values("date", kind="stable")
+
+
+@st.cache_data(ttl=3600)
+def filter_range(lo, hi):
+    data = sorted_sample_data()
+    dates = data["date"].values
+    i0 = np.searchsorted(dates, np.datetime64(lo), side="left")
+    i1 = np.searchsorted(dates, np.datetime64(hi), side="right")
+    return data.iloc[i0:i1]
+
+
+@st.cache_data(ttl=3600)
+def to_csv_bytes(lo, hi) -> bytes:
+    return filter_range(lo, hi).to_csv(index=False).encode()
+
+
+@st.cache_resource
+def argo_image():
+    # Raw PNG bytes: st.image sends these as-is, whereas a PIL image would
+    # be re-encoded on every call
+    with open("Screenshot 2025-09-08 001347.png", "rb") as f:
+        return f.read()
+
+
+# -------------------------
+# Figure builders (cached per input)
+# -------------------------
+# Shared plotly.js config: resize with the container, no Plotly logo
+PLOTLY_CONFIG = {"responsive": True, "displaylogo": False}
+
+
+@st.cache_data
+def build_explore_line(_filtered, start, end, param):
+    # `_filtered` is not hashed; the date range and parameter identify it.
+    # The resampler caps each trace at a fixed number of shown points (LTTB),
+    # so payload size stays bounded however many rows the range selects.
+    # Only the downsampled traces are kept: the resampler's full-resolution
+    # data would otherwise be pickled into the cache and copied on every hit.
+    fig = FigureResampler(go.Figure(), default_n_shown_samples=1000)
+    for float_id, group in _filtered.groupby("float_id", sort=True):
+        fig.add_trace(go.Scattergl(name=float_id, mode="lines+markers"),
+                      hf_x=group["date"], hf_y=group[param])
+    # plotly.js keeps zoom/pan while `uirevision` is unchanged, so key it on
+    # every input: a new parameter or date range must reset the axes.
+    fig.update_layout(title=f"{param.title()} over time", xaxis_title="date", yaxis_title=param,
+                      legend_title_text="float_id", uirevision=f"explore_line_{param}_{start}_{end}")
+    return go.Figure(fig.data, fig.layout)
+
+
+@st.cache_resource
+def build_float_map(color_by):
+    # deck.gl has no continuous colour scale, so map `color_by` onto blue -> red
+    values = sample_data[color_by]
+    norm = (values - values.min()) / (values.max() - values.min())
+    points = sample_data[["float_id", "lat", "lon", color_by]].assign(
+        color=[[int(255 * n), 0, int(255 * (1 - n))] for n in norm.fillna(0.5)]
+    )
+    layer = pdk.Layer(
+        "ScatterplotLayer", data=points, get_position="[lon, lat]",
+        get_fill_color="color", get_radius=50000, pickable=True
+    )
+    return pdk.Deck(
+        layers=[layer],
+        initial_view_state=pdk.ViewState(latitude=5, longitude=50, zoom=2),
+        tooltip={"text": f"{{float_id}}\n{color_by}: {{{color_by}}}"}
+    )
+
+
+def float_map_caption(color_by):
+    # Stands in for the colour bar deck.gl doesn't draw
+    values = sample_data[color_by]
+    return f"Colour: {color_by} from blue (min {values.min():.1f}) to red (max {values.max():.1f})"
+
+
+@st.cache_data
+def build_salinity_temperature_scatter():
+    fig = px.scatter(sample_data, x="salinity", y="temperature", color="float_id", size="temperature",
+                     render_mode="webgl")
+    fig.update_layout(uirevision="salinity_temperature_scatter")
+    return fig
+
+
+def dbg(msg):
+    if st.session_state.get("debug"):
+        st.write(msg)
+
 
 # Sidebar
 with st.sidebar:
@@ -26,7 +146,6 @@ with st.sidebar:
 # -------------------------
 # Streamlit UI
 # -------------------------
-st.set_page_config(page_title="🌊 FloatChat (Enhanced Frontend)", layout="wide")
 st.sidebar.title("🌊 FloatChat Dashboard")
 
 # User role selection
@@ -36,77 +155,94 @@ menu = st.sidebar.radio(
     "📍 Navigation",
     ["Chatbot", "Explore Data", "Visualizations", "Query History"]
 )
+st.sidebar.checkbox("🐞 Debug", key="debug")
+
 # Main layout
-col_map, col_chart = st.columns([1, 1])
+def render_overview():
+    col_map, col_chart = st.columns([1, 1])
+
+    with col_map:
+        st.subheader("🌍 Live Map (ARGO)")
+        st.image(argo_image(),
+             caption="ARGO Observation Network (Static View)",
+             width="stretch")
 
-with col_map:
-    st.subheader("🌍 Live Map (ARGO)")
-    st.image("Screenshot 2025-09-08 001347.png",
-         caption="ARGO Observation Network (Static View)",
-         use_container_width=True)
+    with col_chart:
+        st.subheader("📈 Salinity Chart")
+        st.line_chart(sample_data, x="date", y="salinity")
+        dbg("Salinity chart generated.")
+
+
+render_overview()
 
-with col_chart:
-    st.subheader("📈 Salinity Chart")
-    fig = px.line(sample_data, x="date", y="salinity", markers=True, title="Salinity over Time")
-    st.plotly_chart(fig, use_container_width=True)
-    st.write("--- Debugging: Salinity Chart --- ")
-    st.write("Salinity chart figure generated.")
-    st.write("--- End Debugging: Salinity Chart ---")
 
 # -------------------------
 # Chatbot Page
 # -------------------------
-if menu == "Chatbot":
-    st.title("💬 FloatChat – Conversational AI (Demo)")
+MAX_MESSAGES = 50
 
-    if "messages" not in st.session_state:
-        st.session_state["messages"] = []
 
-    # Display history
-    for msg in st.session_state["messages"]:
+def add_message(role, content):
+    messages = st.session_state["messages"]
+    # A full deque drops its oldest entry on append, shifting every index left
+    if len(messages) == messages.maxlen and st.session_state.get("last_assistant_idx") is not None:
+        st.session_state["last_assistant_idx"] -= 1
+    messages.append({"role": role, "content": content})
+
+
+def render_chat_history():
+    # Only the latest demo reply carries the data table and map; older
+    # messages are text-only so history cost doesn't grow with its length.
+    last_idx = st.session_state.get("last_assistant_idx")
+    for i, msg in enumerate(st.session_state["messages"]):
         with st.chat_message(msg["role"]):
             st.write(msg["content"])
+            if i == last_idx:
+                st.dataframe(sample_data)
+
+                st.pydeck_chart(build_float_map("temperature"), width="stretch")
+                st.caption(float_map_caption("temperature"))
+                dbg("Chatbot float map generated.")
 
-    # Chat input
+
+@st.fragment
+def render_chatbot():
+    st.title("💬 FloatChat – Conversational AI (Demo)")
+
+    if "messages" not in st.session_state:
+        st.session_state["messages"] = deque(maxlen=MAX_MESSAGES)
+
+    # Chat input (pinned to the bottom, so handling it first doesn't move it)
     if prompt := st.chat_input("Ask about ARGO data..."):
-        st.session_state["messages"].append({"role": "user", "content": prompt})
-        with st.chat_message("user"):
-            st.write(prompt)
+        add_message("user", prompt)
 
         # Demo reply
         response = f"🤖 (Demo) Hi {user_role}, here's some placeholder data for: {prompt}"
-        st.session_state["messages"].append({"role": "assistant", "content": response})
-
-        with st.chat_message("assistant"):
-            st.write(response)
-            st.dataframe(sample_data)
+        add_message("assistant", response)
+        st.session_state["last_assistant_idx"] = len(st.session_state["messages"]) - 1
 
-            fig = px.scatter_geo(
-                sample_data, lat="lat", lon="lon", text="float_id",
-                color="temperature", projection="natural earth"
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            st.write("--- Debugging: Chatbot Scatter Geo Chart --- ")
-            st.write("Chatbot scatter geo chart figure generated.")
-            st.write("--- End Debugging: Chatbot Scatter Geo Chart ---")
+    # Display history
+    render_chat_history()
 
     # Quick suggestions
     st.write("👉 Quick Queries:")
     cols = st.columns(3)
     if cols[0].button("Show floats in March 2023"):
-        st.session_state["messages"].append({"role": "assistant", "content": "Showing floats for March 2023 (Demo)."})
-        st.dataframe(sample_data[sample_data["date"].dt.month == 3])
+        add_message("assistant", "Showing floats for March 2023 (Demo).")
+        st.dataframe(march_2023_df())
     if cols[1].button("Show salinity profiles"):
-        st.session_state["messages"].append({"role": "assistant", "content": "Showing salinity profiles (Demo)."})
-        st.line_chart(sample_data.set_index("date")["salinity"])
+        add_message("assistant", "Showing salinity profiles (Demo).")
+        st.line_chart(salinity_series())
     if cols[2].button("Show temperature trends"):
-        st.session_state["messages"].append({"role": "assistant", "content": "Showing temperature trends (Demo)."})
-        st.line_chart(sample_data.set_index("date")["temperature"])
+        add_message("assistant", "Showing temperature trends (Demo).")
+        st.line_chart(temperature_series())
+
 
 # -------------------------
 # Explore Data Page
 # -------------------------
-elif menu == "Explore Data":
+@st.fragment
+def render_explore():
     st.title("🔍 Explore ARGO Data (Demo)")
 
     # Filters
@@ -116,56 +252,47 @@ elif menu == "Explore Data":
     )
     param = st.selectbox("Choose Parameter", ["salinity", "temperature"])
 
-    filtered = sample_data[
-        (sample_data["date"] >= pd.to_datetime(date_range[0])) &
-        (sample_data["date"] <= pd.to_datetime(date_range[1]))
-    ]
+    filtered = filter_range(date_range[0], date_range[1])
 
     st.dataframe(filtered)
 
-    fig = px.line(filtered, x="date", y=param, color="float_id", markers=True, title=f"{param.title()} over time")
-    st.plotly_chart(fig, use_container_width=True)
-    st.write("--- Debugging: Explore Data Line Chart --- ")
-    st.write("Explore Data line chart figure generated.")
-    st.write("--- End Debugging: Explore Data Line Chart ---")
+    fig = build_explore_line(filtered, date_range[0], date_range[1], param)
+    st.plotly_chart(fig, width="stretch", config=PLOTLY_CONFIG)
+    dbg("Explore Data line chart figure generated.")
 
     # Download option
-    st.download_button("⬇️ Download Data (CSV)", filtered.to_csv(index=False), "argo_data.csv", "text/csv")
+    st.download_button("⬇️ Download Data (CSV)", to_csv_bytes(date_range[0], date_range[1]), "argo_data.csv", "text/csv")
+
 
 # -------------------------
 # Visualizations Page
 # -------------------------
-elif menu == "Visualizations":
+@st.fragment
+def render_viz():
     st.title("📊 Visualizations (Demo)")
 
     tab1, tab2, tab3 = st.tabs(["🌍 Map", "📈 Line Chart", "⚪ Scatter Plot"])
 
     with tab1:
-        
-        fig = px.scatter_geo(sample_data, lat="lat", lon="lon", text="float_id",
-                             color="salinity", projection="natural earth")
-        st.plotly_chart(fig, use_container_width=True)
-        st.write("--- Debugging: Visualizations Map --- ")
-        st.write("Visualizations map figure generated.")
-        st.write("--- End Debugging: Visualizations Map ---")
+        st.pydeck_chart(build_float_map("salinity"), width="stretch")
+        st.caption(float_map_caption("salinity"))
+        dbg("Visualizations map generated.")
 
     with tab2:
         st.line_chart(sample_data.set_index("date")[["salinity", "temperature"]])
-        st.write("--- Debugging: Visualizations Line Chart --- ")
-        st.write("Visualizations line chart figure generated.")
-        st.write("--- End Debugging: Visualizations Line Chart ---")
+        dbg("Visualizations line chart figure generated.")
 
     with tab3:
-        fig = px.scatter(sample_data, x="salinity", y="temperature", color="float_id", size="temperature")
-        st.plotly_chart(fig, use_container_width=True)
-        st.write("--- Debugging: Visualizations Scatter Plot --- ")
-        st.write("Visualizations scatter plot figure generated.")
-        st.write("--- End Debugging: Visualizations Scatter Plot ---")
+        fig = build_salinity_temperature_scatter()
+        st.plotly_chart(fig, width="stretch", config=PLOTLY_CONFIG)
+        dbg("Visualizations scatter plot figure generated.")
+
 
 # -------------------------
 # Query History Page
 # -------------------------
-elif menu == "Query History":
+@st.fragment
+def render_history():
     st.title("📜 Query History (Demo)")
     if "messages" in st.session_state and st.session_state["messages"]:
         for msg in st.session_state["messages"]:
@@ -173,3 +300,16 @@ elif menu == "Query History":
             st.write(f"{role}: {msg['content']}")
     else:
         st.info("No queries yet.")
+
+
+# -------------------------
+# Page dispatch
+# -------------------------
+PAGES = {
+    "Chatbot": render_chatbot,
+    "Explore Data": render_explore,
+    "Visualizations": render_viz,
+    "Query History": render_history,
+}
+
+PAGES[menu]()